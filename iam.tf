@@ -101,6 +101,15 @@ resource "aws_iam_role_policy" "lambda_secrets" {
           [aws_secretsmanager_secret.tfc_token.arn],
           var.ca_bundle_secret_name != "" ? ["arn:aws:secretsmanager:${data.aws_region.current.region}:${data.aws_caller_identity.current.account_id}:secret:${var.ca_bundle_secret_name}*"] : []
         )
+      },
+      {
+        # BatchGetSecretValue only supports "*"; each secret it returns is
+        # still authorized against GetSecretValue above
+        Effect = "Allow"
+        Action = [
+          "secretsmanager:BatchGetSecretValue"
+        ]
+        Resource = "*"
       }
     ]
   })
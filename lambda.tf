@@ -35,10 +35,24 @@ data "archive_file" "upload_from_s3" {
   output_path = "${path.module}/builds/upload_from_s3.zip"
 }
 
+# Python packages installed into the Lambda layer
+locals {
+  lambda_layer_packages = ["requests", "orjson"]
+}
+
 resource "terraform_data" "lambda_builds_directory" {
-  count = var.allow_local_exec_commands ? 1 : 0
+  # Rebuild when the package list changes, not only the runtime or architecture
+  count            = var.allow_local_exec_commands ? 1 : 0
+  triggers_replace = [var.lambda_runtime, var.lambda_architecture, local.lambda_layer_packages]
+  # Install wheels for the Lambda runtime and architecture, not the build host
   provisioner "local-exec" {
-    command = "pip3 install requests -t ${path.module}/lambda/layer/python/"
+    command = join(" ", [
+      "pip3 install ${join(" ", local.lambda_layer_packages)} --upgrade",
+      "--platform ${var.lambda_architecture == "arm64" ? "manylinux2014_aarch64" : "manylinux2014_x86_64"}",
+      "--implementation cp --python-version ${trimprefix(var.lambda_runtime, "python")}",
+      "--only-binary=:all:",
+      "-t ${path.module}/lambda/layer/python/"
+    ])
   }
 
 }
@@ -53,14 +67,15 @@ data "archive_file" "lambda_layer" {
   depends_on  = [terraform_data.lambda_builds_directory[0]]
 }
 
-# Lambda Layer with requests library
+# Lambda Layer with requests and orjson libraries
 resource "aws_lambda_layer_version" "requests" {
-  count               = var.allow_local_exec_commands ? 1 : 0
-  filename            = data.archive_file.lambda_layer[0].output_path
-  layer_name          = "${var.project_name}-requests-layer"
-  source_code_hash    = data.archive_file.lambda_layer[0].output_base64sha256
-  compatible_runtimes = [var.lambda_runtime]
-  description         = "Python requests library for provider sync Lambda functions"
+  count                    = var.allow_local_exec_commands ? 1 : 0
+  filename                 = data.archive_file.lambda_layer[0].output_path
+  layer_name               = "${var.project_name}-requests-layer"
+  source_code_hash         = data.archive_file.lambda_layer[0].output_base64sha256
+  compatible_runtimes      = [var.lambda_runtime]
+  compatible_architectures = [var.lambda_architecture]
+  description              = "Python requests and orjson libraries for provider sync Lambda functions"
 
 }
 
@@ -102,6 +117,7 @@ resource "aws_lambda_function" "read_config" {
   handler          = "read_config.lambda_handler"
   source_code_hash = data.archive_file.read_config.output_base64sha256
   runtime          = var.lambda_runtime
+  architectures    = [var.lambda_architecture]
   timeout          = 60
   memory_size      = 256
   layers           = [var.allow_local_exec_commands ? aws_lambda_layer_version.requests[0].arn : var.lambda_layer_arn]
@@ -125,6 +141,7 @@ resource "aws_lambda_function" "check_version" {
   handler          = "check_version.lambda_handler"
   source_code_hash = data.archive_file.check_version.output_base64sha256
   runtime          = var.lambda_runtime
+  architectures    = [var.lambda_architecture]
   timeout          = 120
   memory_size      = 256
   layers           = [var.allow_local_exec_commands ? aws_lambda_layer_version.requests[0].arn : var.lambda_layer_arn]
@@ -143,6 +160,7 @@ resource "aws_lambda_function" "check_version" {
       TFC_ORGANIZATION      = var.tfc_organization
       TFC_ADDRESS           = var.tfc_address
       CA_BUNDLE_SECRET_NAME = var.ca_bundle_secret_name
+      SECRET_CACHE_TTL      = var.secret_cache_ttl
       LOG_LEVEL             = "INFO"
     }
   }
@@ -160,6 +178,7 @@ resource "aws_lambda_function" "error_handler" {
   handler          = "error_handler.lambda_handler"
   source_code_hash = data.archive_file.error_handler.output_base64sha256
   runtime          = var.lambda_runtime
+  architectures    = [var.lambda_architecture]
   timeout          = 60
   memory_size      = 256
   layers           = [var.allow_local_exec_commands ? aws_lambda_layer_version.requests[0].arn : var.lambda_layer_arn]
@@ -184,6 +203,7 @@ resource "aws_lambda_function" "cleanup_old_versions" {
   handler          = "cleanup_old_versions.lambda_handler"
   source_code_hash = data.archive_file.cleanup_old_versions.output_base64sha256
   runtime          = var.lambda_runtime
+  architectures    = [var.lambda_architecture]
   timeout          = 900
   memory_size      = 512
   layers           = [var.allow_local_exec_commands ? aws_lambda_layer_version.requests[0].arn : var.lambda_layer_arn]
@@ -203,6 +223,7 @@ resource "aws_lambda_function" "cleanup_old_versions" {
       TFC_ADDRESS           = var.tfc_address
       KEEP_VERSION_COUNT    = var.cleanup_keep_version_count
       DRY_RUN               = var.cleanup_dry_run ? "true" : "false"
+      SECRET_CACHE_TTL      = var.secret_cache_ttl
       LOG_LEVEL             = "INFO"
     }
   }
@@ -225,6 +246,7 @@ resource "aws_lambda_function" "download_to_s3" {
   handler          = "download_to_s3.lambda_handler"
   source_code_hash = data.archive_file.download_to_s3.output_base64sha256
   runtime          = var.lambda_runtime
+  architectures    = [var.lambda_architecture]
   timeout          = var.lambda_timeout
   memory_size      = var.lambda_memory_size
   layers           = [var.allow_local_exec_commands ? aws_lambda_layer_version.requests[0].arn : var.lambda_layer_arn]
@@ -260,6 +282,7 @@ resource "aws_lambda_function" "upload_from_s3" {
   handler          = "upload_from_s3.lambda_handler"
   source_code_hash = data.archive_file.upload_from_s3.output_base64sha256
   runtime          = var.lambda_runtime
+  architectures    = [var.lambda_architecture]
   timeout          = var.lambda_timeout
   memory_size      = var.lambda_memory_size
   layers           = [var.allow_local_exec_commands ? aws_lambda_layer_version.requests[0].arn : var.lambda_layer_arn]
@@ -282,6 +305,7 @@ resource "aws_lambda_function" "upload_from_s3" {
       TFC_ORGANIZATION      = var.tfc_organization
       TFC_ADDRESS           = var.tfc_address
       CA_BUNDLE_SECRET_NAME = var.ca_bundle_secret_name
+      SECRET_CACHE_TTL      = var.secret_cache_ttl
       LOG_LEVEL             = "INFO"
     }
   }
@@ -4,62 +4,192 @@ AWS Lambda function to check if provider version exists on HCP Terraform.
 
 import os
 import logging
-import boto3
+import hashlib
+import time
 import requests
 import tempfile
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Set, Tuple
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # Configure logging
 logger = logging.getLogger()
 log_level = os.environ.get('LOG_LEVEL', 'INFO').upper()
 logger.setLevel(getattr(logging, log_level, logging.INFO))
 
-# Secrets Manager client
-secretsmanager = boto3.client('secretsmanager')
-
-# Global CA bundle path
+# Configuration is read once per container; required values are validated
+# by the handler so a misconfiguration surfaces as a task error
+TFC_TOKEN_SECRET_NAME = os.environ.get('TFC_TOKEN_SECRET_NAME')
+TFC_ORGANIZATION = os.environ.get('TFC_ORGANIZATION')
+TFC_ADDRESS = os.environ.get('TFC_ADDRESS', 'https://app.terraform.io')
+CA_BUNDLE_SECRET_NAME = os.environ.get('CA_BUNDLE_SECRET_NAME')
+
+# Secrets Manager client, created on first use to keep botocore out of cold start
+_secretsmanager = None
+
+# Secrets cached across warm invocations: name -> (value, expiry)
+SECRET_CACHE_TTL = int(os.environ.get('SECRET_CACHE_TTL', '600'))
+_secret_cache: Dict[str, Tuple[str, float]] = {}
+
+# HTTP session shared across warm invocations so TLS connections are reused
+_session = requests.Session()
+_adapter = HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=50,
+    max_retries=Retry(
+        total=3,
+        backoff_factor=0.2,
+        status_forcelist=[429, 500, 502, 503, 504],
+        raise_on_status=False))
+_session.mount('http://', _adapter)
+_session.mount('https://', _adapter)
+
+# Versions confirmed to exist on HCP/TFE by this container:
+# (provider, version). Only positive results are kept, since a missing
+# version can be uploaded at any time.
+MAX_KNOWN_VERSIONS = 1024
+_known_versions: Set[Tuple[str, str]] = set()
+
+# CA bundle is re-read from Secrets Manager after this many seconds
+CA_BUNDLE_MAX_AGE = 600
+
+# CA bundle location; rotations replace the file in place
+CA_BUNDLE_PATH = os.path.join(tempfile.gettempdir(), 'ca-bundle.pem')
+
+# Global CA bundle state
 _ca_bundle_path: Optional[str] = None
+_ca_bundle_digest: Optional[str] = None
+_ca_bundle_loaded_at = 0.0
+
+
+def ca_bundle_is_fresh() -> bool:
+    """Return whether the CA bundle file is in place and younger than CA_BUNDLE_MAX_AGE."""
+    return (
+        _ca_bundle_path is not None
+        and time.monotonic() - _ca_bundle_loaded_at < CA_BUNDLE_MAX_AGE
+        and os.path.isfile(_ca_bundle_path)
+    )
 
 
 def get_ca_bundle_path() -> Optional[str]:
-    """Get CA bundle path from Secrets Manager."""
-    global _ca_bundle_path
+    """
+    Get CA bundle path from Secrets Manager.
+    The bundle is re-read after CA_BUNDLE_MAX_AGE seconds to pick up
+    rotations; the file is only rewritten when its content changed.
+    """
+    global _ca_bundle_path, _ca_bundle_digest, _ca_bundle_loaded_at
 
-    if _ca_bundle_path:
+    if ca_bundle_is_fresh():
         return _ca_bundle_path
 
-    ca_secret_name = os.environ.get('CA_BUNDLE_SECRET_NAME')
-    if not ca_secret_name:
+    if _ca_bundle_path and not os.path.isfile(_ca_bundle_path):
+        # /tmp lost the file; write it again on this call
+        _ca_bundle_path = None
+        _ca_bundle_digest = None
+
+    if not CA_BUNDLE_SECRET_NAME:
         logger.debug("No CA bundle secret configured")
         return None
 
     try:
-        logger.info(f"Retrieving CA bundle from Secrets Manager: {ca_secret_name}")
-        ca_bundle = get_secret(ca_secret_name)
+        logger.info(f"Retrieving CA bundle from Secrets Manager: {CA_BUNDLE_SECRET_NAME}")
+        ca_bundle = get_secret(CA_BUNDLE_SECRET_NAME)
+        digest = hashlib.sha256(ca_bundle.encode('utf-8')).hexdigest()
 
-        # Write to temp file
-        fd, path = tempfile.mkstemp(suffix='.pem')
-        with os.fdopen(fd, 'w') as f:
-            f.write(ca_bundle)
+        if digest != _ca_bundle_digest:
+            write_ca_bundle(ca_bundle)
+            _ca_bundle_path = CA_BUNDLE_PATH
+            _ca_bundle_digest = digest
+            logger.info(f"CA bundle written to: {CA_BUNDLE_PATH}")
 
-        _ca_bundle_path = path
-        logger.info(f"CA bundle written to: {path}")
-        return path
+        _ca_bundle_loaded_at = time.monotonic()
+        return _ca_bundle_path
     except Exception as e:
         logger.warning(f"Failed to retrieve CA bundle: {e}. Using default CA verification.")
-        return None
+        return _ca_bundle_path
+
+
+def write_ca_bundle(ca_bundle: str) -> None:
+    """
+    Write the CA bundle atomically, so a rotation never exposes a partial
+    file to requests still reading the previous one.
+    """
+    with tempfile.NamedTemporaryFile(
+            'w', dir=os.path.dirname(CA_BUNDLE_PATH), suffix='.pem', delete=False) as f:
+        f.write(ca_bundle)
+    try:
+        os.replace(f.name, CA_BUNDLE_PATH)
+    except OSError:
+        os.unlink(f.name)
+        raise
+
+
+def get_secretsmanager_client():
+    """
+    Return the Secrets Manager client, creating it on first use.
+    Built directly from botocore with short timeouts and standard retries,
+    skipping the boto3 resource layer.
+    """
+    global _secretsmanager
+
+    if _secretsmanager is None:
+        from botocore.config import Config
+        from botocore.session import get_session
+        _secretsmanager = get_session().create_client(
+            'secretsmanager',
+            config=Config(
+                connect_timeout=2,
+                read_timeout=5,
+                retries={'max_attempts': 3, 'mode': 'standard'},
+                tcp_keepalive=True))
+    return _secretsmanager
 
 
 def get_secret(secret_name: str) -> str:
-    """Retrieve secret from AWS Secrets Manager."""
+    """Retrieve secret from AWS Secrets Manager, cached across warm invocations."""
+    cached = _secret_cache.get(secret_name)
+    if cached and cached[1] > time.monotonic():
+        return cached[0]
+
     try:
-        response = secretsmanager.get_secret_value(SecretId=secret_name)
-        return response['SecretString']
+        response = get_secretsmanager_client().get_secret_value(SecretId=secret_name)
+        secret = response['SecretString']
+        _secret_cache[secret_name] = (secret, time.monotonic() + SECRET_CACHE_TTL)
+        return secret
     except Exception as e:
         logger.error(f"Error retrieving secret {secret_name}: {str(e)}")
         raise
 
 
+def prefetch_secrets(secret_names: List[Optional[str]]) -> None:
+    """
+    Warm the secret cache with one BatchGetSecretValue call.
+    Only uncached names are requested; any the batch does not return, or
+    all of them if the call fails, are left to get_secret.
+    """
+    now = time.monotonic()
+    stale = [
+        name for name in secret_names
+        if name and not (name in _secret_cache and _secret_cache[name][1] > now)
+    ]
+    if len(stale) < 2:
+        return
+
+    try:
+        response = get_secretsmanager_client().batch_get_secret_value(SecretIdList=stale)
+    except Exception as e:
+        logger.debug(f"Batch secret retrieval failed, fetching secrets individually: {e}")
+        return
+
+    expiry = time.monotonic() + SECRET_CACHE_TTL
+    for value in response.get('SecretValues', []):
+        if 'SecretString' not in value:
+            continue
+        for secret_id in (value.get('Name'), value.get('ARN')):
+            if secret_id in stale:
+                _secret_cache[secret_id] = (value['SecretString'], expiry)
+
+
 def lambda_handler(event: Dict, context) -> Dict:
     """
     Check if provider version already exists on HCP Terraform.
@@ -82,40 +212,60 @@ def lambda_handler(event: Dict, context) -> Dict:
     }
     """
     try:
-        # Get configuration from environment
-        secret_name = os.environ.get('TFC_TOKEN_SECRET_NAME')
-        organization = os.environ.get('TFC_ORGANIZATION')
-        tfc_address = os.environ.get('TFC_ADDRESS', 'https://app.terraform.io')
-
-        if not secret_name or not organization:
+        if not TFC_TOKEN_SECRET_NAME or not TFC_ORGANIZATION:
             raise ValueError(
                 "Missing required environment variables: TFC_TOKEN_SECRET_NAME, TFC_ORGANIZATION")
 
-        # Retrieve token from Secrets Manager
-        logger.debug(
-            f"Retrieving TFC token from Secrets Manager: {secret_name}")
-        token = get_secret(secret_name)
-
         provider = event['provider']
         namespace = event['namespace']
         version = event['version']  # Already resolved by read_config Lambda
 
-        logger.info(f"Checking if {namespace}/{provider} v{version} exists on {tfc_address}")
+        if not version:
+            raise ValueError(f"Missing resolved version for {namespace}/{provider}")
+
+        # Versions seen on HCP/TFE by this container need no further round-trips
+        cache_key = (provider, version)
+        if cache_key in _known_versions:
+            logger.info(f"{namespace}/{provider} v{version} already known to exist on {TFC_ADDRESS}")
+            version_exists = True
+        else:
+            # Retrieve token (and CA bundle, unless the file on disk is still
+            # fresh) from Secrets Manager in one call
+            logger.debug(
+                f"Retrieving TFC token from Secrets Manager: {TFC_TOKEN_SECRET_NAME}")
+            secret_names = [TFC_TOKEN_SECRET_NAME]
+            if not ca_bundle_is_fresh():
+                secret_names.append(CA_BUNDLE_SECRET_NAME)
+            prefetch_secrets(secret_names)
+            token = get_secret(TFC_TOKEN_SECRET_NAME)
+
+            # Authentication and TLS verification are configured on the session
+            # once per invocation
+            _session.headers.update({
+                "Authorization": f"Bearer {token}",
+                "Content-Type": "application/vnd.api+json"
+            })
+            _session.verify = get_ca_bundle_path() or True
+
+            logger.info(f"Checking if {namespace}/{provider} v{version} exists on {TFC_ADDRESS}")
+
+            # Check if version exists on HCP/TFE
+            version_exists = check_version_on_hcp(
+                TFC_ORGANIZATION, provider, version, TFC_ADDRESS
+            )
+            if version_exists:
+                if len(_known_versions) >= MAX_KNOWN_VERSIONS:
+                    _known_versions.clear()
+                _known_versions.add(cache_key)
 
-        # Check if version exists on HCP/TFE
-        version_exists = check_version_on_hcp(
-            organization, provider, version, token, tfc_address
-        )
         logger.info(
             f"Version exists: {version_exists}, should process: {not version_exists}")
 
-        # Add results to event
-        return {
-            **event,
-            'versionExists': version_exists,
-            'shouldProcess': not version_exists,
-            'statusCode': 200
-        }
+        # Add results to event in place rather than copying the payload
+        event['versionExists'] = version_exists
+        event['shouldProcess'] = not version_exists
+        event['statusCode'] = 200
+        return event
 
     except Exception as e:
         logger.error(f"Error checking HCP version: {str(e)}")
@@ -126,26 +276,26 @@ def check_version_on_hcp(
         organization: str,
         provider: str,
         version: str,
-        token: str,
         tfc_address: str = 'https://app.terraform.io') -> bool:
     """Check if version exists on HCP Terraform or Terraform Enterprise."""
     url = (
         f"{tfc_address}/api/v2/organizations/{organization}/"
         f"registry-providers/private/{organization}/{provider}/versions/{version}")
 
-    headers = {
-        "Authorization": f"Bearer {token}",
-        "Content-Type": "application/vnd.api+json"
-    }
-
-    ca_bundle = get_ca_bundle_path()
-    verify = ca_bundle if ca_bundle else True
-
     logger.info(f"Checking version existence at: {url}")
-    logger.debug(f"Using CA bundle: {ca_bundle}")
+    logger.debug(f"Using CA verification: {_session.verify}")
 
+    # Only the status code matters, so ask for headers only.
     # Explicitly disable proxy for VPC-to-TFE communication
-    response = requests.get(url, headers=headers, timeout=10, verify=verify, proxies={})
+    response = _session.head(url, timeout=10, proxies={})
+    if response.status_code in [405, 501]:
+        # HEAD not supported, fetch the version with a minimal sparse fieldset
+        logger.debug(f"HEAD returned {response.status_code}, falling back to GET")
+        response = _session.get(
+            url,
+            params={'fields[registry-provider-versions]': 'version'},
+            timeout=10,
+            proxies={})
 
     logger.info(f"Response status: {response.status_code}")
     if response.status_code not in [200, 404]:
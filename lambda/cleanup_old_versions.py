@@ -5,139 +5,266 @@ Keeps the most recent N versions and deletes older ones.
 
 import os
 import logging
+import re
+import time
 import json
-import boto3
 import requests
-from typing import Dict, List
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, List, Optional, Tuple
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# orjson is optional; when the Lambda layer provides it, API responses are
+# decoded with it instead of the standard library
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
 
 # Configure logging
 logger = logging.getLogger()
-logger.setLevel(os.environ.get('LOG_LEVEL', 'INFO'))
-
-# AWS clients
-secretsmanager = boto3.client('secretsmanager')
+log_level = os.environ.get('LOG_LEVEL', 'INFO').upper()
+logger.setLevel(getattr(logging, log_level, logging.INFO))
+
+# Configuration is read once per container; a missing required variable
+# fails the cold start instead of every invocation
+TFC_TOKEN_SECRET_NAME = os.environ['TFC_TOKEN_SECRET_NAME']
+TFC_ORGANIZATION = os.environ['TFC_ORGANIZATION']
+TFC_ADDRESS = os.environ.get('TFC_ADDRESS', 'https://app.terraform.io')
+KEEP_VERSION_COUNT = int(os.environ.get('KEEP_VERSION_COUNT', '10'))
+DRY_RUN = os.environ.get('DRY_RUN', 'false').lower() == 'true'
+
+# Secrets Manager client, created on first use to keep botocore out of cold start
+_secretsmanager = None
+
+# Secrets cached across warm invocations: name -> (value, expiry)
+SECRET_CACHE_TTL = int(os.environ.get('SECRET_CACHE_TTL', '600'))
+_secret_cache: Dict[str, Tuple[str, float]] = {}
+
+# HTTP session shared across warm invocations so TLS connections are reused.
+# All worker threads talk to the same host; pool_block makes them wait for
+# one of the MAX_CONNECTIONS kept-alive connections instead of opening
+# short-lived extra ones when more requests are in flight than the pool holds.
+MAX_CONNECTIONS = 50
+_session = requests.Session()
+_adapter = HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=MAX_CONNECTIONS,
+    pool_block=True,
+    max_retries=Retry(
+        total=3,
+        backoff_factor=0.2,
+        status_forcelist=[429, 500, 502, 503, 504],
+        raise_on_status=False))
+_session.mount('http://', _adapter)
+_session.mount('https://', _adapter)
+
+# Number of providers cleaned up concurrently
+MAX_PROVIDER_WORKERS = 8
+
+# Upper bound on concurrent DELETE requests per provider (TFE rate limits)
+MAX_DELETE_WORKERS = 5
+
+# Page size for list requests (TFE maximum) and concurrent page fetches
+PAGE_SIZE = 100
+MAX_PAGE_WORKERS = 8
+
+# Sparse fieldset for version listings; only the version string is used
+VERSION_FIELDS = {'fields[registry-provider-versions]': 'version'}
+
+# Semantic version: numeric core, optional pre-release and build metadata
+_VERSION_RE = re.compile(
+    r'^v?(\d+(?:\.\d+)*)(?:-([0-9A-Za-z.-]+))?(?:\+[0-9A-Za-z.-]+)?$'
+)
+
+
+def get_secretsmanager_client():
+    """
+    Return the Secrets Manager client, creating it on first use.
+    Built directly from botocore with short timeouts and standard retries,
+    skipping the boto3 resource layer.
+    """
+    global _secretsmanager
+
+    if _secretsmanager is None:
+        from botocore.config import Config
+        from botocore.session import get_session
+        _secretsmanager = get_session().create_client(
+            'secretsmanager',
+            config=Config(
+                connect_timeout=2,
+                read_timeout=5,
+                retries={'max_attempts': 3, 'mode': 'standard'},
+                tcp_keepalive=True))
+    return _secretsmanager
 
 
 def get_secret(secret_name: str) -> str:
-    """Retrieve secret from AWS Secrets Manager."""
+    """Retrieve secret from AWS Secrets Manager, cached across warm invocations."""
+    cached = _secret_cache.get(secret_name)
+    if cached and cached[1] > time.monotonic():
+        return cached[0]
+
     try:
-        response = secretsmanager.get_secret_value(SecretId=secret_name)
-        return response['SecretString']
+        response = get_secretsmanager_client().get_secret_value(SecretId=secret_name)
+        secret = response['SecretString']
+        _secret_cache[secret_name] = (secret, time.monotonic() + SECRET_CACHE_TTL)
+        return secret
     except Exception as e:
-        logger.error(f"Failed to retrieve secret {secret_name}: {str(e)}")
+        logger.error("Failed to retrieve secret %s: %s", secret_name, e)
         raise
 
 
+def get_page(url: str, page_number: int, extra_params: Optional[Dict] = None) -> Dict:
+    """Fetch a single page of a paginated TFE API collection."""
+    params = {'page[number]': page_number, 'page[size]': PAGE_SIZE}
+    if extra_params:
+        params.update(extra_params)
+    response = _session.get(url, params=params, timeout=30)
+    response.raise_for_status()
+    return _json_loads(response.content)
+
+
+def list_all_pages(
+        url: str,
+        tfc_address: str,
+        first_page: Optional[Dict] = None,
+        extra_params: Optional[Dict] = None,
+        project: Optional[Callable[[Dict], object]] = None) -> List:
+    """
+    Fetch every item of a paginated TFE API collection.
+    The first page reports the total page count, so the remaining pages
+    are fetched concurrently. An already fetched first page is reused.
+    When project is given, each item is replaced by project(item) as its
+    page arrives, so full pages are not kept for the whole listing.
+    """
+    def page_items(page: Dict) -> List:
+        data = page.get('data', [])
+        return [project(item) for item in data] if project else data
+
+    data = first_page if first_page is not None else get_page(url, 1, extra_params)
+    items = list(page_items(data))
+
+    pagination = data.get('meta', {}).get('pagination')
+    if pagination:
+        total_pages = pagination.get('total-pages', 1)
+        if total_pages > 1:
+            max_workers = min(MAX_PAGE_WORKERS, total_pages - 1)
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                pages = executor.map(
+                    lambda page_number: get_page(url, page_number, extra_params),
+                    range(2, total_pages + 1)
+                )
+                for page in pages:
+                    items.extend(page_items(page))
+        return items
+
+    # No pagination metadata, follow the next links instead
+    next_page = data.get('links', {}).get('next')
+    while next_page:
+        response = _session.get(f"{tfc_address}{next_page}", timeout=30)
+        response.raise_for_status()
+
+        data = _json_loads(response.content)
+        items.extend(page_items(data))
+        next_page = data.get('links', {}).get('next')
+
+    return items
+
+
 def list_providers(
         organization: str,
-        token: str,
         tfc_address: str = 'https://app.terraform.io') -> List[Dict]:
     """List all private providers in the organization."""
     url = (
         f"{tfc_address}/api/v2/organizations/{organization}/"
         f"registry-providers"
     )
-    headers = {
-        'Authorization': f'Bearer {token}',
-        'Content-Type': 'application/vnd.api+json'
-    }
-
-    providers = []
-    while url:
-        logger.info(f"Fetching providers from: {url}")
-        response = requests.get(url, headers=headers, timeout=30)
-        response.raise_for_status()
-
-        data = response.json()
-        providers.extend(data.get('data', []))
+    logger.info("Fetching providers from: %s", url)
+    providers = list_all_pages(url, tfc_address)
 
-        # Handle pagination
-        next_page = data.get('links', {}).get('next')
-        url = f"{tfc_address}{next_page}" if next_page else None
-
-    logger.info(f"Found {len(providers)} providers")
+    logger.info("Found %d providers", len(providers))
     return providers
 
 
-def list_provider_versions(
+def provider_versions_url(
         organization: str,
         registry_name: str,
         namespace: str,
         provider: str,
-        token: str,
-        tfc_address: str = 'https://app.terraform.io') -> List[Dict]:
-    """List all versions for a specific provider."""
-    url = (
+        tfc_address: str) -> str:
+    """Build the versions collection URL for a provider."""
+    return (
         f"{tfc_address}/api/v2/organizations/{organization}/"
         f"registry-providers/{registry_name}/{namespace}/{provider}/versions"
     )
-    headers = {
-        'Authorization': f'Bearer {token}',
-        'Content-Type': 'application/vnd.api+json'
-    }
 
-    versions = []
-    while url:
-        response = requests.get(url, headers=headers, timeout=30)
-        response.raise_for_status()
 
-        data = response.json()
-        versions.extend(data.get('data', []))
+def count_provider_versions(versions_url: str) -> Tuple[Optional[int], Dict]:
+    """
+    Fetch the first page of a provider's versions.
+    Returns the total version count reported by the API (None if absent)
+    together with the first page, so it can be reused for a full listing.
+    """
+    first_page = get_page(versions_url, 1, VERSION_FIELDS)
+    total_count = first_page.get('meta', {}).get('pagination', {}).get('total-count')
+    return total_count, first_page
 
-        # Handle pagination
-        next_page = data.get('links', {}).get('next')
-        url = f"{tfc_address}{next_page}" if next_page else None
 
-    return versions
+def list_provider_versions(
+        versions_url: str,
+        tfc_address: str = 'https://app.terraform.io',
+        first_page: Optional[Dict] = None) -> List[str]:
+    """List all version strings for a specific provider."""
+    return list_all_pages(
+        versions_url, tfc_address, first_page, VERSION_FIELDS,
+        lambda v: v['attributes']['version']
+    )
 
 
 def delete_provider_version(
-        organization: str,
-        registry_name: str,
-        namespace: str,
+        versions_url: str,
         provider: str,
-        version: str,
-        token: str,
-        tfc_address: str = 'https://app.terraform.io') -> bool:
+        version: str) -> bool:
     """Delete a specific provider version."""
-    url = (
-        f"{tfc_address}/api/v2/organizations/{organization}/"
-        f"registry-providers/{registry_name}/{namespace}/{provider}/"
-        f"versions/{version}"
-    )
-    headers = {
-        'Authorization': f'Bearer {token}',
-        'Content-Type': 'application/vnd.api+json'
-    }
-
     try:
-        response = requests.delete(url, headers=headers, timeout=30)
+        response = _session.delete(f"{versions_url}/{version}", timeout=30)
         response.raise_for_status()
-        logger.info(
-            f"Deleted version {version} of provider {provider}"
-        )
+        logger.info("Deleted version %s of provider %s", version, provider)
         return True
     except requests.exceptions.HTTPError as e:
         if e.response.status_code == 404:
-            logger.warning(
-                f"Version {version} of provider {provider} not found"
-            )
+            logger.warning("Version %s of provider %s not found", version, provider)
             return False
         logger.error(
-            f"Failed to delete version {version} of provider {provider}: "
-            f"{str(e)}"
+            "Failed to delete version %s of provider %s: %s",
+            version, provider, e
         )
         raise
 
 
 def parse_version(version_string: str) -> tuple:
-    """Parse semantic version string into comparable tuple."""
-    try:
-        parts = version_string.lstrip('v').split('.')
-        return tuple(int(p) for p in parts)
-    except (ValueError, AttributeError):
-        logger.warning(f"Could not parse version: {version_string}")
-        return (0, 0, 0)
+    """
+    Parse semantic version string into comparable tuple.
+    Pre-releases sort before their release (1.2.3-rc1 < 1.2.3).
+    """
+    match = _VERSION_RE.match(version_string) if isinstance(version_string, str) else None
+    if not match:
+        logger.warning("Could not parse version: %s", version_string)
+        return ((0, 0, 0), 0, ())
+
+    core, prerelease = match.groups()
+    numbers = tuple(int(p) for p in core.split('.'))
+    if prerelease is None:
+        return (numbers, 1, ())
+
+    # Numeric identifiers sort before alphanumeric ones (SemVer 2.0 rule 11)
+    identifiers = tuple(
+        (0, int(p), '') if p.isdigit() else (1, 0, p)
+        for p in prerelease.split('.')
+    )
+    return (numbers, 0, identifiers)
 
 
 def cleanup_provider_versions(
@@ -146,75 +273,89 @@ def cleanup_provider_versions(
         namespace: str,
         provider: str,
         keep_count: int,
-        token: str,
         tfc_address: str = 'https://app.terraform.io',
         dry_run: bool = False) -> Dict:
     """Clean up old versions of a provider, keeping the most recent N."""
     logger.info(
-        f"Cleaning up provider {registry_name}/{namespace}/{provider}, "
-        f"keeping {keep_count} versions"
+        "Cleaning up provider %s/%s/%s, keeping %d versions",
+        registry_name, namespace, provider, keep_count
     )
 
-    # Get all versions
-    versions = list_provider_versions(
-        organization, registry_name, namespace, provider, token, tfc_address
+    # Built once and shared by the list and delete requests below
+    versions_url = provider_versions_url(
+        organization, registry_name, namespace, provider, tfc_address
     )
 
+    # The first page reports the total count, which is enough to tell
+    # whether anything needs deleting
+    total_count, first_page = count_provider_versions(versions_url)
+    first_page_versions = first_page.get('data', [])
+    if total_count is not None and total_count <= min(keep_count, len(first_page_versions)):
+        logger.info(
+            "Provider %s has %d versions, no cleanup needed",
+            provider, total_count
+        )
+        return {
+            'provider': provider,
+            'total_versions': total_count,
+            'deleted_versions': [],
+            'kept_versions': [v['attributes']['version'] for v in first_page_versions]
+        }
+
+    # Get all versions
+    versions = list_provider_versions(versions_url, tfc_address, first_page)
+
     if len(versions) <= keep_count:
         logger.info(
-            f"Provider {provider} has {len(versions)} versions, "
-            f"no cleanup needed"
+            "Provider %s has %d versions, no cleanup needed",
+            provider, len(versions)
         )
         return {
             'provider': provider,
             'total_versions': len(versions),
             'deleted_versions': [],
-            'kept_versions': [v['attributes']['version'] for v in versions]
+            'kept_versions': versions
         }
 
     # Sort versions by semantic version (newest first)
-    sorted_versions = sorted(
-        versions,
-        key=lambda v: parse_version(v['attributes']['version']),
-        reverse=True
-    )
-
-    # Determine which versions to keep and delete
-    versions_to_keep = sorted_versions[:keep_count]
-    versions_to_delete = sorted_versions[keep_count:]
+    sorted_versions = sorted(versions, key=parse_version, reverse=True)
 
-    kept_version_strings = [
-        v['attributes']['version'] for v in versions_to_keep
-    ]
+    # Determine which versions to keep and delete; deletes go oldest first
+    kept_version_strings = sorted_versions[:keep_count]
+    versions_to_delete = sorted_versions[keep_count:][::-1]
     deleted_version_strings = []
 
-    logger.info(
-        f"Keeping versions: {', '.join(kept_version_strings)}"
-    )
-    logger.info(
-        f"Deleting {len(versions_to_delete)} old versions"
-    )
+    logger.info("Keeping versions: %s", ', '.join(kept_version_strings))
+    logger.info("Deleting %d old versions", len(versions_to_delete))
 
     # Delete old versions
-    for version in versions_to_delete:
-        version_string = version['attributes']['version']
-        if dry_run:
+    if dry_run:
+        for version_string in versions_to_delete:
             logger.info(
-                f"[DRY RUN] Would delete version {version_string} "
-                f"of provider {registry_name}/{namespace}/{provider}"
+                "[DRY RUN] Would delete version %s of provider %s/%s/%s",
+                version_string, registry_name, namespace, provider
             )
             deleted_version_strings.append(version_string)
-        else:
-            try:
-                delete_provider_version(
-                    organization, registry_name, namespace, provider,
-                    version_string, token, tfc_address
-                )
-                deleted_version_strings.append(version_string)
-            except Exception as e:
-                logger.error(
-                    f"Failed to delete version {version_string}: {str(e)}"
-                )
+    else:
+        # Issue the DELETE requests concurrently; 429s are retried by the session
+        max_workers = min(MAX_DELETE_WORKERS, len(versions_to_delete))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(
+                    delete_provider_version,
+                    versions_url, provider, version_string
+                ): version_string
+                for version_string in versions_to_delete
+            }
+            for future in as_completed(futures):
+                version_string = futures[future]
+                try:
+                    future.result()
+                    deleted_version_strings.append(version_string)
+                except Exception as e:
+                    logger.error(
+                        "Failed to delete version %s: %s", version_string, e
+                    )
 
     return {
         'provider': provider,
@@ -227,17 +368,16 @@ def cleanup_provider_versions(
 
 def lambda_handler(event, context):
     """Lambda handler for cleaning up old provider versions."""
-    logger.info(f"Cleanup event: {json.dumps(event)}")
-
-    # Get configuration from environment variables
-    secret_name = os.environ['TFC_TOKEN_SECRET_NAME']
-    organization = os.environ['TFC_ORGANIZATION']
-    tfc_address = os.environ.get('TFC_ADDRESS', 'https://app.terraform.io')
-    keep_count = int(os.environ.get('KEEP_VERSION_COUNT', '10'))
-    dry_run = os.environ.get('DRY_RUN', 'false').lower() == 'true'
+    # Serializing the event is only worth it when it will be emitted
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Cleanup event: %s", json.dumps(event))
 
-    # Get TFC token from Secrets Manager
-    token = get_secret(secret_name)
+    # Get TFC token from Secrets Manager and authenticate the shared session
+    token = get_secret(TFC_TOKEN_SECRET_NAME)
+    _session.headers.update({
+        'Authorization': f'Bearer {token}',
+        'Content-Type': 'application/vnd.api+json'
+    })
 
     # Get optional provider filter from event
     provider_filter = event.get('provider', None)
@@ -245,50 +385,54 @@ def lambda_handler(event, context):
     try:
         # Get all providers or specific provider
         if provider_filter:
-            logger.info(f"Cleaning up specific provider: {provider_filter}")
+            logger.info("Cleaning up specific provider: %s", provider_filter)
             # For filtered provider, assume private registry
             results = [
                 cleanup_provider_versions(
-                    organization,
+                    TFC_ORGANIZATION,
                     'private',
-                    organization,
+                    TFC_ORGANIZATION,
                     provider_filter,
-                    keep_count,
-                    token,
-                    tfc_address,
-                    dry_run
+                    KEEP_VERSION_COUNT,
+                    TFC_ADDRESS,
+                    DRY_RUN
                 )
             ]
         else:
             logger.info("Cleaning up all providers")
-            providers = list_providers(organization, token, tfc_address)
-
-            results = []
-            for provider_data in providers:
-                provider_name = provider_data['attributes']['name']
-                # Extract registry-name and namespace from attributes
-                registry_name = provider_data['attributes'].get(
-                    'registry-name', 'private'
-                )
-                namespace = provider_data['attributes'].get(
-                    'namespace', organization
-                )
-                try:
-                    result = cleanup_provider_versions(
-                        organization,
+            providers = list_providers(TFC_ORGANIZATION, TFC_ADDRESS)
+
+            # Providers are independent, so clean them up concurrently
+            futures = []
+            with ThreadPoolExecutor(max_workers=MAX_PROVIDER_WORKERS) as executor:
+                for provider_data in providers:
+                    provider_name = provider_data['attributes']['name']
+                    # Extract registry-name and namespace from attributes
+                    registry_name = provider_data['attributes'].get(
+                        'registry-name', 'private'
+                    )
+                    namespace = provider_data['attributes'].get(
+                        'namespace', TFC_ORGANIZATION
+                    )
+                    future = executor.submit(
+                        cleanup_provider_versions,
+                        TFC_ORGANIZATION,
                         registry_name,
                         namespace,
                         provider_name,
-                        keep_count,
-                        token,
-                        tfc_address,
-                        dry_run
+                        KEEP_VERSION_COUNT,
+                        TFC_ADDRESS,
+                        DRY_RUN
                     )
-                    results.append(result)
+                    futures.append((provider_name, future))
+
+            results = []
+            for provider_name, future in futures:
+                try:
+                    results.append(future.result())
                 except Exception as e:
                     logger.error(
-                        f"Failed to cleanup provider {provider_name}: "
-                        f"{str(e)}"
+                        "Failed to cleanup provider %s: %s", provider_name, e
                     )
                     results.append({
                         'provider': provider_name,
@@ -306,8 +450,8 @@ def lambda_handler(event, context):
 
         summary = {
             'status': 'success',
-            'dry_run': dry_run,
-            'keep_count': keep_count,
+            'dry_run': DRY_RUN,
+            'keep_count': KEEP_VERSION_COUNT,
             'total_providers_checked': total_providers,
             'providers_cleaned': providers_cleaned,
             'total_versions_deleted': total_deleted,
@@ -315,14 +459,14 @@ def lambda_handler(event, context):
         }
 
         logger.info(
-            f"Cleanup complete: {total_deleted} versions deleted "
-            f"across {providers_cleaned} providers"
+            "Cleanup complete: %d versions deleted across %d providers",
+            total_deleted, providers_cleaned
         )
 
         return summary
 
     except Exception as e:
-        logger.error(f"Cleanup failed: {str(e)}", exc_info=True)
+        logger.error("Cleanup failed: %s", e, exc_info=True)
         return {
             'status': 'error',
             'error': str(e)
@@ -6,17 +6,64 @@ This Lambda is NOT in VPC to access public internet directly.
 import os
 import logging
 import boto3
+import hashlib
 import json
-from typing import Dict, List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
 import requests
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
+from botocore.exceptions import ClientError
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# orjson is optional; when the Lambda layer provides it, the manifest is
+# serialized with it instead of the standard library
+try:
+    import orjson
+
+    def _json_dumps(obj) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+except ImportError:
+    def _json_dumps(obj) -> bytes:
+        return json.dumps(obj, indent=2).encode('utf-8')
 
 # Configure logging
 logger = logging.getLogger()
 log_level = os.environ.get('LOG_LEVEL', 'INFO').upper()
 logger.setLevel(getattr(logging, log_level, logging.INFO))
 
-# S3 client
-s3_client = boto3.client('s3')
+# S3 client, with enough pooled connections for concurrent platform uploads
+s3_client = boto3.client('s3', config=Config(max_pool_connections=30))
+
+# Upper bound on platforms downloaded concurrently
+MAX_PLATFORM_WORKERS = 10
+
+# HTTP session shared by the platform workers and across warm invocations,
+# so connections to the registry and release hosts are kept alive
+_session = requests.Session()
+_adapter = HTTPAdapter(
+    pool_connections=30,
+    pool_maxsize=30,
+    max_retries=Retry(
+        total=3,
+        backoff_factor=0.3,
+        status_forcelist=[429, 500, 502, 503, 504],
+        raise_on_status=False))
+_session.mount('http://', _adapter)
+_session.mount('https://', _adapter)
+
+# Responses smaller than this (SHA256SUMS, signatures) are sent with a
+# single put_object instead of the multipart transfer machinery
+SMALL_OBJECT_SIZE = 5 * 1024 * 1024
+
+# Multipart settings for streaming binaries into S3: parts are sent in parallel
+TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=8 * 1024 * 1024,
+    multipart_chunksize=8 * 1024 * 1024,
+    max_concurrency=10,
+    use_threads=True
+)
 
 
 def lambda_handler(event: Dict, context) -> Dict:
@@ -38,8 +85,8 @@ def lambda_handler(event: Dict, context) -> Dict:
         "provider": "aws",
         "version": "6.26.0",
         "s3Bucket": "...",
-        "s3Prefix": "tmp/aws/6.26.0/",
-        "manifestKey": "tmp/aws/6.26.0/manifest.json"
+        "s3Prefix": "tmp/hashicorp/aws/6.26.0/",
+        "manifestKey": "tmp/hashicorp/aws/6.26.0/manifest.json"
     }
     """
     try:
@@ -58,8 +105,9 @@ def lambda_handler(event: Dict, context) -> Dict:
         logger.info(f"Downloading {namespace}/{provider} v{version} to S3")
         logger.info(f"Platforms: {len(platforms)}")
 
-        # Create S3 prefix for this provider/version
-        s3_prefix = f"tmp/{provider}/{version}/"
+        # Create S3 prefix for this provider/version; the namespace keeps
+        # same-named providers from different publishers apart
+        s3_prefix = f"tmp/{namespace}/{provider}/{version}/"
 
         # Download provider files to S3
         manifest = download_provider_to_s3(
@@ -78,7 +126,7 @@ def lambda_handler(event: Dict, context) -> Dict:
         s3_client.put_object(
             Bucket=bucket_name,
             Key=manifest_key,
-            Body=json.dumps(manifest, indent=2),
+            Body=_json_dumps(manifest),
             ContentType='application/json'
         )
 
@@ -108,9 +156,12 @@ def download_provider_to_s3(
         bucket: str,
         s3_prefix: str
 ) -> Dict:
-    """Download provider files from public registry to S3."""
+    """
+    Download provider files from public registry to S3.
+    SHA256SUMS and its signature are shared by all platforms and are
+    fetched once up front; the platform binaries are downloaded concurrently.
+    """
     logger.debug(f"Starting download for {namespace}/{provider} v{version}")
-    registry_base = "https://registry.terraform.io/v1/providers"
 
     manifest = {
         'binaries': [],
@@ -118,70 +169,192 @@ def download_provider_to_s3(
         'signature_key': None
     }
 
-    shasums_downloaded = False
-    sig_downloaded = False
+    if not platforms:
+        return manifest
 
-    for platform in platforms:
-        os_name = platform['os']
-        arch = platform['arch']
-        logger.debug(f"Downloading binary for {os_name}/{arch}")
+    # Any platform's download info carries the shared SHA256SUMS/signature URLs
+    download_info = get_download_info(namespace, provider, version, platforms[0])
 
-        # Get download info
-        url = f"{registry_base}/{namespace}/{provider}/{version}/download/{os_name}/{arch}"
-        response = requests.get(url, timeout=30)
+    # Download SHA256SUMS. It is always fetched again, since its digests
+    # decide which binaries already in S3 can be reused.
+    expected_shasums = {}
+    shasums_url = download_info.get('shasums_url')
+    if shasums_url:
+        shasums_filename = f"terraform-provider-{provider}_{version}_SHA256SUMS"
+        shasums_key = f"{s3_prefix}{shasums_filename}"
+        response = _session.get(shasums_url, timeout=30)
         response.raise_for_status()
+        s3_client.put_object(Bucket=bucket, Key=shasums_key, Body=response.content)
+        expected_shasums = parse_shasums(response.content)
+        manifest['shasums_key'] = shasums_key
+
+    # Download signature
+    sig_url = download_info.get('shasums_signature_url')
+    if sig_url:
+        sig_filename = f"terraform-provider-{provider}_{version}_SHA256SUMS.sig"
+        sig_key = f"{s3_prefix}{sig_filename}"
+        download_to_s3(sig_url, bucket, sig_key)
+        manifest['signature_key'] = sig_key
+
+    def fetch_one(platform: Dict, platform_info: Optional[Dict]) -> Dict:
+        return download_platform_to_s3(
+            namespace, provider, version, platform, bucket, s3_prefix,
+            expected_shasums, platform_info
+        )
 
-        download_info = response.json()
-
-        # Download binary to S3
-        download_url = download_info['download_url']
-        filename = f"terraform-provider-{provider}_{version}_{os_name}_{arch}.zip"
-        s3_key = f"{s3_prefix}{filename}"
-
-        download_to_s3(download_url, bucket, s3_key)
-
-        manifest['binaries'].append({
-            'os': os_name,
-            'arch': arch,
-            'filename': filename,
-            's3_key': s3_key
-        })
-
-        # Download SHA256SUMS (only once)
-        if not shasums_downloaded:
-            shasums_url = download_info.get('shasums_url')
-            if shasums_url:
-                shasums_filename = f"terraform-provider-{provider}_{version}_SHA256SUMS"
-                shasums_key = f"{s3_prefix}{shasums_filename}"
-                download_to_s3(shasums_url, bucket, shasums_key)
-                manifest['shasums_key'] = shasums_key
-                shasums_downloaded = True
-
-        # Download signature (only once)
-        if not sig_downloaded:
-            sig_url = download_info.get('shasums_signature_url')
-            if sig_url:
-                sig_filename = f"terraform-provider-{provider}_{version}_SHA256SUMS.sig"
-                sig_key = f"{s3_prefix}{sig_filename}"
-                download_to_s3(sig_url, bucket, sig_key)
-                manifest['signature_key'] = sig_key
-                sig_downloaded = True
+    # Platform binaries are independent; results keep the configured order.
+    # The first platform's download info is already known and is reused.
+    known_info = [download_info] + [None] * (len(platforms) - 1)
+    max_workers = min(MAX_PLATFORM_WORKERS, len(platforms))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        manifest['binaries'] = list(executor.map(fetch_one, platforms, known_info))
 
     return manifest
 
 
-def download_to_s3(url: str, bucket: str, s3_key: str) -> None:
-    """Download a file from URL directly to S3."""
-    logger.debug(f"Downloading {url} to s3://{bucket}/{s3_key}")
-
-    response = requests.get(url, stream=True, timeout=300)
+def get_download_info(
+        namespace: str,
+        provider: str,
+        version: str,
+        platform: Dict
+) -> Dict:
+    """Get download info for a single platform from the public registry."""
+    url = (
+        f"https://registry.terraform.io/v1/providers/{namespace}/{provider}/"
+        f"{version}/download/{platform['os']}/{platform['arch']}"
+    )
+    response = _session.get(url, timeout=30)
     response.raise_for_status()
 
-    # Stream directly to S3
-    s3_client.upload_fileobj(
-        response.raw,
+    return response.json()
+
+
+def download_platform_to_s3(
+        namespace: str,
+        provider: str,
+        version: str,
+        platform: Dict,
+        bucket: str,
+        s3_prefix: str,
+        expected_shasums: Dict[str, str],
+        download_info: Optional[Dict] = None
+) -> Dict:
+    """
+    Download the binary for one platform to S3 and describe it for the manifest.
+    The platform's registry download info is looked up unless already given.
+    A binary already in S3 (from a retried or repeated run) is only reused
+    when the SHA256 stored with it matches the current SHA256SUMS entry.
+    """
+    os_name = platform['os']
+    arch = platform['arch']
+    filename = f"terraform-provider-{provider}_{version}_{os_name}_{arch}.zip"
+    s3_key = f"{s3_prefix}{filename}"
+    expected = expected_shasums.get(filename)
+
+    if expected and stored_sha256(bucket, s3_key) == expected:
+        logger.info(f"Binary for {os_name}/{arch} already present in S3, skipping download")
+        shasum = expected
+    else:
+        logger.debug(f"Downloading binary for {os_name}/{arch}")
+
+        if download_info is None:
+            download_info = get_download_info(namespace, provider, version, platform)
+
+        # Download binary to S3. The upload replaces any earlier object
+        # together with its metadata, so a failed check below leaves the key
+        # without a recorded digest and it is downloaded again next time.
+        shasum = download_to_s3(download_info['download_url'], bucket, s3_key)
+        if expected:
+            if shasum != expected:
+                raise ValueError(
+                    f"SHA256 mismatch for {filename}: downloaded {shasum}, "
+                    f"SHA256SUMS lists {expected}")
+            record_sha256(bucket, s3_key, shasum)
+
+    return {
+        'os': os_name,
+        'arch': arch,
+        'filename': filename,
+        's3_key': s3_key,
+        'shasum': shasum
+    }
+
+
+def stored_sha256(bucket: str, s3_key: str) -> Optional[str]:
+    """Return the SHA256 recorded with an S3 object, or None if it is missing."""
+    try:
+        response = s3_client.head_object(Bucket=bucket, Key=s3_key)
+    except ClientError as e:
+        if e.response.get('Error', {}).get('Code') in ('404', 'NoSuchKey', 'NotFound'):
+            return None
+        raise
+    return response.get('Metadata', {}).get('sha256')
+
+
+def record_sha256(bucket: str, s3_key: str, shasum: str) -> None:
+    """Record a verified SHA256 with an S3 object by copying it onto itself."""
+    s3_client.copy(
+        {'Bucket': bucket, 'Key': s3_key},
         bucket,
-        s3_key
+        s3_key,
+        ExtraArgs={'Metadata': {'sha256': shasum}, 'MetadataDirective': 'REPLACE'},
+        Config=TRANSFER_CONFIG
     )
 
+
+def parse_shasums(content: bytes) -> Dict[str, str]:
+    """Parse SHA256SUMS content into {filename: sha256}."""
+    shasums = {}
+    for line in content.decode('utf-8').splitlines():
+        parts = line.split()
+        if len(parts) == 2:
+            shasums[parts[1].lstrip('*')] = parts[0]
+    return shasums
+
+
+class HashingReader:
+    """File-like wrapper that computes the SHA256 of everything read through it."""
+
+    def __init__(self, raw):
+        self._raw = raw
+        self._sha256 = hashlib.sha256()
+
+    def read(self, size: int = -1) -> bytes:
+        data = self._raw.read(size)
+        self._sha256.update(data)
+        return data
+
+    def hexdigest(self) -> str:
+        return self._sha256.hexdigest()
+
+
+def download_to_s3(url: str, bucket: str, s3_key: str) -> str:
+    """
+    Download a file from URL directly to S3.
+    Returns the SHA256 of the uploaded content, computed while streaming.
+    """
+    logger.debug(f"Downloading {url} to s3://{bucket}/{s3_key}")
+
+    # Closing the response hands its connection back to the session pool
+    with _session.get(url, stream=True, timeout=300) as response:
+        response.raise_for_status()
+
+        content_length = response.headers.get('Content-Length')
+        if content_length is not None and int(content_length) < SMALL_OBJECT_SIZE:
+            body = response.content
+            s3_client.put_object(Bucket=bucket, Key=s3_key, Body=body)
+            logger.debug(f"Successfully uploaded to S3: {s3_key}")
+            return hashlib.sha256(body).hexdigest()
+
+        # Stream directly to S3, undoing any transfer Content-Encoding
+        response.raw.decode_content = True
+        reader = HashingReader(response.raw)
+        s3_client.upload_fileobj(
+            reader,
+            bucket,
+            s3_key,
+            Config=TRANSFER_CONFIG
+        )
+
     logger.debug(f"Successfully uploaded to S3: {s3_key}")
+    return reader.hexdigest()
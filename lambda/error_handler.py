@@ -7,7 +7,7 @@ import json
 import logging
 import boto3
 from typing import Dict
-from datetime import datetime
+from datetime import datetime, timezone
 
 # Configure logging
 logger = logging.getLogger()
@@ -16,6 +16,27 @@ logger.setLevel(getattr(logging, log_level, logging.INFO))
 
 sns_client = boto3.client('sns')
 
+# Static troubleshooting footer appended to every error email
+_FOOTER = """
+TROUBLESHOOTING
+---------------
+1. Check the config file in S3 is valid JSON
+2. Verify TFC_TOKEN and TFC_ORGANIZATION are set correctly
+3. Ensure GPG key exists on HCP Terraform
+4. Check provider version exists in public registry
+5. Review CloudWatch Logs for detailed error traces
+
+NEXT STEPS
+----------
+- Review the error message above
+- Check the Step Functions execution in AWS Console
+- Verify the configuration file
+- Re-run the workflow after fixing the issue
+
+---
+This notification was generated automatically by the Terraform Provider Synchronization workflow.
+"""
+
 
 def lambda_handler(event: Dict, context) -> Dict:
     """
@@ -108,9 +129,9 @@ def format_error_email(error_type: str, error_message: str, provider: str,
                        namespace: str, version: str, bucket: str, key: str,
                        event: Dict) -> str:
     """Format error as readable email."""
-    timestamp = datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S UTC')
+    timestamp = datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S UTC')
 
-    email_body = f"""
+    parts = [f"""
 Terraform Provider Synchronization Failed
 ==========================================
 
@@ -131,44 +152,27 @@ Error Message:
 
 WORKFLOW CONTEXT
 ----------------
-"""
+"""]
 
     # Add relevant context fields
     if event.get('versionExists') is not None:
-        email_body += f"Version Exists on HCP: {event['versionExists']}\n"
+        parts.append(f"Version Exists on HCP: {event['versionExists']}\n")
 
     if event.get('resolvedVersion'):
-        email_body += f"Resolved Version: {event['resolvedVersion']}\n"
+        parts.append(f"Resolved Version: {event['resolvedVersion']}\n")
 
     if event.get('shouldProcess') is not None:
-        email_body += f"Should Process: {event['shouldProcess']}\n"
+        parts.append(f"Should Process: {event['shouldProcess']}\n")
 
     # Add platforms if available
     platforms = event.get('platforms', [])
     if platforms:
-        email_body += f"\nPlatforms ({len(platforms)}):\n"
-        for platform in platforms:
-            email_body += f"  - {platform.get('os', 'unknown')}/{platform.get('arch', 'unknown')}\n"
-
-    # Add footer
-    email_body += """
-TROUBLESHOOTING
----------------
-1. Check the config file in S3 is valid JSON
-2. Verify TFC_TOKEN and TFC_ORGANIZATION are set correctly
-3. Ensure GPG key exists on HCP Terraform
-4. Check provider version exists in public registry
-5. Review CloudWatch Logs for detailed error traces
-
-NEXT STEPS
-----------
-- Review the error message above
-- Check the Step Functions execution in AWS Console
-- Verify the configuration file
-- Re-run the workflow after fixing the issue
+        parts.append(f"\nPlatforms ({len(platforms)}):\n")
+        parts.extend(
+            f"  - {platform.get('os', 'unknown')}/{platform.get('arch', 'unknown')}\n"
+            for platform in platforms
+        )
 
----
-This notification was generated automatically by the Terraform Provider Synchronization workflow.
-"""
+    parts.append(_FOOTER)
 
-    return email_body
+    return ''.join(parts)
@@ -6,8 +6,18 @@ import json
 import os
 import logging
 import boto3
-import requests
-from typing import Dict
+import urllib3
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Tuple
+from urllib3.util.retry import Retry
+
+# orjson is optional; when the Lambda layer provides it, the config file and
+# registry responses are decoded with it instead of the standard library
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
 
 # Configure logging
 logger = logging.getLogger()
@@ -16,6 +26,27 @@ logger.setLevel(getattr(logging, log_level, logging.INFO))
 
 s3_client = boto3.client('s3')
 
+# Fields every provider config entry must define
+REQUIRED_FIELDS = frozenset({'provider', 'namespace', 'platforms'})
+
+# Upper bound on concurrent "latest" version lookups
+MAX_RESOLVE_WORKERS = 16
+
+# Connection pool reused across warm invocations for registry lookups.
+# urllib3 is used directly; requests adds nothing for a single GET and
+# costs import time on cold start.
+_http = urllib3.PoolManager(
+    num_pools=4,
+    maxsize=MAX_RESOLVE_WORKERS,
+    retries=Retry(
+        total=3,
+        backoff_factor=0.3,
+        status_forcelist=[429, 500, 502, 503, 504],
+        raise_on_status=False))
+
+# Registry responses cached across warm invocations: (namespace, provider) -> (etag, version)
+_registry_cache: Dict[Tuple[str, str], Tuple[str, str]] = {}
+
 
 def lambda_handler(event: Dict, context) -> Dict:
     """
@@ -46,8 +77,7 @@ def lambda_handler(event: Dict, context) -> Dict:
 
         # Read config from S3
         response = s3_client.get_object(Bucket=bucket, Key=key)
-        config_content = response['Body'].read().decode('utf-8')
-        config = json.loads(config_content)
+        config = _json_loads(response['Body'].read())
 
         # Handle both single object and array of objects
         if isinstance(config, dict):
@@ -64,21 +94,25 @@ def lambda_handler(event: Dict, context) -> Dict:
 
         # Validate and enrich each provider config
         enriched_providers = []
+        latest_requested = set()
         for idx, provider_config in enumerate(providers):
-            # Validate required fields
-            required_fields = ['provider', 'namespace', 'platforms']
-            for field in required_fields:
-                if field not in provider_config:
-                    raise ValueError(
-                        f"Provider {idx}: Missing required field '{field}' in config file")
+            if not isinstance(provider_config, dict):
+                raise ValueError(f"Provider {idx}: Config entry must be an object")
+
+            # Validate required fields, reporting all missing ones at once
+            missing = REQUIRED_FIELDS - provider_config.keys()
+            if missing:
+                raise ValueError(
+                    f"Provider {idx}: Missing required fields {sorted(missing)} in config file")
 
             version = provider_config.get('version', 'latest')
 
-            # Resolve "latest" version from public registry
-            if version.lower() == 'latest':
-                logger.info(f"Resolving 'latest' version for {provider_config['namespace']}/{provider_config['provider']}")
-                version = get_latest_version(provider_config['namespace'], provider_config['provider'])
-                logger.info(f"Resolved to version: {version}")
+            # "latest" is resolved from the public registry below; the length
+            # check skips lowercasing for pinned versions like "6.26.0"
+            if len(version) == 6 and version.lower() == 'latest':
+                version = None
+                latest_requested.add(
+                    (provider_config['namespace'], provider_config['provider']))
 
             # Enrich with extracted fields for easy access
             enriched_config = {
@@ -92,9 +126,27 @@ def lambda_handler(event: Dict, context) -> Dict:
                 'key': key
             }
             enriched_providers.append(enriched_config)
+
+        # Resolve "latest" versions concurrently, once per distinct provider
+        latest_versions = {}
+        if latest_requested:
+            pairs = sorted(latest_requested)
+            logger.info(f"Resolving 'latest' version for {len(pairs)} providers")
+            max_workers = min(MAX_RESOLVE_WORKERS, len(pairs))
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                latest_versions = dict(zip(
+                    pairs,
+                    executor.map(lambda np: get_latest_version(*np), pairs)))
+            for (namespace, provider), version in latest_versions.items():
+                logger.info(f"Resolved {namespace}/{provider} 'latest' to version: {version}")
+
+        for enriched_config in enriched_providers:
+            if enriched_config['version'] is None:
+                enriched_config['version'] = latest_versions[
+                    (enriched_config['namespace'], enriched_config['provider'])]
             logger.info(
-                f"Validated: {provider_config['namespace']}/{provider_config['provider']} "
-                f"v{version}")
+                f"Validated: {enriched_config['namespace']}/{enriched_config['provider']} "
+                f"v{enriched_config['version']}")
 
         logger.info(
             f"Successfully read and validated {len(enriched_providers)} provider configs")
@@ -121,14 +173,30 @@ def lambda_handler(event: Dict, context) -> Dict:
 def get_latest_version(namespace: str, provider: str) -> str:
     """Get latest version from Terraform public registry."""
     url = f"https://registry.terraform.io/v1/providers/{namespace}/{provider}"
-
-    response = requests.get(url, timeout=10)
-    response.raise_for_status()
-
-    data = response.json()
+    cache_key = (namespace, provider)
+
+    # Revalidate a cached answer with a conditional GET; the registry replies
+    # 304 without a body when the provider has not changed
+    headers = {}
+    cached = _registry_cache.get(cache_key)
+    if cached:
+        headers['If-None-Match'] = cached[0]
+
+    response = _http.request('GET', url, headers=headers, timeout=10)
+    if cached and response.status == 304:
+        return cached[1]
+    if response.status >= 400:
+        raise RuntimeError(
+            f"Registry lookup for {namespace}/{provider} failed with HTTP {response.status}")
+
+    data = _json_loads(response.data)
     version = data.get("version")
 
     if not version:
         raise ValueError(f"No version found for {namespace}/{provider}")
 
+    etag = response.headers.get('ETag')
+    if etag:
+        _registry_cache[cache_key] = (etag, version)
+
     return version
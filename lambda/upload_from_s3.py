@@ -8,63 +8,255 @@ import logging
 import boto3
 import json
 import hashlib
+import io
+import mmap
 import tempfile
-from pathlib import Path
-from typing import Dict, Optional
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from typing import BinaryIO, Dict, List, Optional, Set, Tuple, Union
+import certifi
 import requests
+import urllib3
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# orjson is optional; when the Lambda layer provides it, the manifest and the
+# HCP request and response bodies go through it instead of the standard library
+try:
+    import orjson
+    _json_loads = orjson.loads
+    _json_dumps = orjson.dumps
+except ImportError:
+    _json_loads = json.loads
+
+    def _json_dumps(obj) -> bytes:
+        return json.dumps(obj).encode('utf-8')
 
 # Configure logging
 logger = logging.getLogger()
 log_level = os.environ.get('LOG_LEVEL', 'INFO').upper()
 logger.setLevel(getattr(logging, log_level, logging.INFO))
 
-# AWS clients
-secretsmanager = boto3.client('secretsmanager')
-s3_client = boto3.client('s3')
-
-# Global CA bundle path
+# Configuration is read once per container; required values are validated
+# by the handler so a misconfiguration surfaces as a task error
+TFC_TOKEN_SECRET_NAME = os.environ.get('TFC_TOKEN_SECRET_NAME')
+TFC_ORGANIZATION = os.environ.get('TFC_ORGANIZATION')
+TFC_ADDRESS = os.environ.get('TFC_ADDRESS', 'https://app.terraform.io')
+CA_BUNDLE_SECRET_NAME = os.environ.get('CA_BUNDLE_SECRET_NAME')
+
+# AWS clients; Secrets Manager is created on first use, since warm
+# invocations are served from the secret cache. The S3 pool covers the
+# concurrent prefetch and transfer threads, and keepalive stops idle
+# connections through the VPC endpoint from being dropped between
+# warm invocations.
+s3_client = boto3.client(
+    's3',
+    config=Config(
+        max_pool_connections=32,
+        tcp_keepalive=True,
+        retries={'max_attempts': 5, 'mode': 'standard'},
+        signature_version='s3v4'))
+_secretsmanager = None
+
+# HTTP session for the HCP API calls only, shared by the upload workers and
+# across warm invocations. Authorization is passed per request; presigned
+# upload PUTs go through _upload_http and never carry the token.
+_session = requests.Session()
+_adapter = HTTPAdapter(
+    pool_connections=32,
+    pool_maxsize=32,
+    max_retries=Retry(
+        total=3,
+        backoff_factor=0.3,
+        status_forcelist=[429, 500, 502, 503, 504],
+        raise_on_status=False))
+_session.mount('http://', _adapter)
+_session.mount('https://', _adapter)
+
+# Bytes read from an upload body per socket send; urllib3 defaults to 16 KiB
+UPLOAD_BLOCK_SIZE = 1024 * 1024
+
+# Connection pool for the presigned upload PUTs, which need none of the
+# requests session machinery and never carry the HCP token. It is built by
+# the handler once the CA bundle is known.
+_upload_http: Optional[urllib3.PoolManager] = None
+_upload_http_ca: Optional[str] = None
+
+# Secrets cached across warm invocations: name -> (value, expiry)
+SECRET_CACHE_TTL = int(os.environ.get('SECRET_CACHE_TTL', '600'))
+_secret_cache: Dict[str, Tuple[str, float]] = {}
+
+# Providers known to exist on HCP/TFE, keyed by their registry URL. A
+# provider is never removed by this pipeline, so positive results stay valid
+# for the life of the container.
+_known_providers: Set[str] = set()
+
+# Upper bound on platform binaries uploaded concurrently, scaled with the
+# vCPUs Lambda allots to the function's memory size
+MAX_PLATFORM_WORKERS = max(4, (os.cpu_count() or 2) * 4)
+
+# Lambda grants a full vCPU from this memory size up; below it, hashing and
+# TLS for the parallel uploads compete for a fraction of one
+FULL_VCPU_MEMORY_MB = 1769
+_memory_mb = int(os.environ.get('AWS_LAMBDA_FUNCTION_MEMORY_SIZE', '0'))
+if 0 < _memory_mb < FULL_VCPU_MEMORY_MB:
+    logger.warning(
+        f"Function memory is {_memory_mb} MB; parallel uploads are CPU-limited "
+        f"below {FULL_VCPU_MEMORY_MB} MB")
+
+# Binaries hashed before upload are held in memory up to this size
+SPOOL_MAX_SIZE = 64 * 1024 * 1024
+
+# Ranged GET settings for reading objects from S3. S3_MAX_CONCURRENCY bounds
+# the threads across all platform workers, so each transfer gets a share.
+S3_MAX_CONCURRENCY = int(os.environ.get('S3_MAX_CONCURRENCY', '32'))
+TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=8 * 1024 * 1024,
+    multipart_chunksize=8 * 1024 * 1024,
+    max_concurrency=max(1, S3_MAX_CONCURRENCY // MAX_PLATFORM_WORKERS),
+    use_threads=True
+)
+
+# CA bundle is re-read from Secrets Manager after this many seconds
+CA_BUNDLE_MAX_AGE = 600
+
+# CA bundle location; rotations replace the file in place
+CA_BUNDLE_PATH = os.path.join(tempfile.gettempdir(), 'ca-bundle.pem')
+
+# Global CA bundle state
 _ca_bundle_path: Optional[str] = None
+_ca_bundle_digest: Optional[str] = None
+_ca_bundle_loaded_at = 0.0
+
+
+def ca_bundle_is_fresh() -> bool:
+    """Return whether the CA bundle file is in place and younger than CA_BUNDLE_MAX_AGE."""
+    return (
+        _ca_bundle_path is not None
+        and time.monotonic() - _ca_bundle_loaded_at < CA_BUNDLE_MAX_AGE
+        and os.path.isfile(_ca_bundle_path)
+    )
 
 
 def get_ca_bundle_path() -> Optional[str]:
-    """Get CA bundle path from Secrets Manager."""
-    global _ca_bundle_path
+    """
+    Get CA bundle path from Secrets Manager.
+    The bundle is re-read after CA_BUNDLE_MAX_AGE seconds to pick up
+    rotations; the file is only rewritten when its content changed.
+    """
+    global _ca_bundle_path, _ca_bundle_digest, _ca_bundle_loaded_at
 
-    if _ca_bundle_path:
+    if ca_bundle_is_fresh():
         return _ca_bundle_path
 
-    ca_secret_name = os.environ.get('CA_BUNDLE_SECRET_NAME')
-    if not ca_secret_name:
+    if _ca_bundle_path and not os.path.isfile(_ca_bundle_path):
+        # /tmp lost the file; write it again on this call
+        _ca_bundle_path = None
+        _ca_bundle_digest = None
+
+    if not CA_BUNDLE_SECRET_NAME:
         logger.debug("No CA bundle secret configured")
         return None
 
     try:
-        logger.info(f"Retrieving CA bundle from Secrets Manager: {ca_secret_name}")
-        ca_bundle = get_secret(ca_secret_name)
+        logger.info(f"Retrieving CA bundle from Secrets Manager: {CA_BUNDLE_SECRET_NAME}")
+        ca_bundle = get_secret(CA_BUNDLE_SECRET_NAME)
+        digest = hashlib.sha256(ca_bundle.encode('utf-8')).hexdigest()
 
-        # Write to temp file
-        fd, path = tempfile.mkstemp(suffix='.pem')
-        with os.fdopen(fd, 'w') as f:
-            f.write(ca_bundle)
+        if digest != _ca_bundle_digest:
+            write_ca_bundle(ca_bundle)
+            _ca_bundle_path = CA_BUNDLE_PATH
+            _ca_bundle_digest = digest
+            logger.info(f"CA bundle written to: {CA_BUNDLE_PATH}")
 
-        _ca_bundle_path = path
-        logger.info(f"CA bundle written to: {path}")
-        return path
+        _ca_bundle_loaded_at = time.monotonic()
+        return _ca_bundle_path
     except Exception as e:
         logger.warning(f"Failed to retrieve CA bundle: {e}. Using default CA verification.")
-        return None
+        return _ca_bundle_path
+
+
+def write_ca_bundle(ca_bundle: str) -> None:
+    """
+    Write the CA bundle atomically, so a rotation never exposes a partial
+    file to requests still reading the previous one.
+    """
+    with tempfile.NamedTemporaryFile(
+            'w', dir=os.path.dirname(CA_BUNDLE_PATH), suffix='.pem', delete=False) as f:
+        f.write(ca_bundle)
+    try:
+        os.replace(f.name, CA_BUNDLE_PATH)
+    except OSError:
+        os.unlink(f.name)
+        raise
+
+
+def get_secretsmanager_client():
+    """
+    Return the Secrets Manager client, creating it on first use.
+    Built directly from botocore with short timeouts and standard retries,
+    skipping the boto3 resource layer.
+    """
+    global _secretsmanager
+    if _secretsmanager is None:
+        from botocore.session import get_session
+        _secretsmanager = get_session().create_client(
+            'secretsmanager',
+            config=Config(
+                connect_timeout=2,
+                read_timeout=5,
+                retries={'max_attempts': 3, 'mode': 'standard'},
+                tcp_keepalive=True))
+    return _secretsmanager
 
 
 def get_secret(secret_name: str) -> str:
-    """Retrieve secret from AWS Secrets Manager."""
+    """Retrieve secret from AWS Secrets Manager, cached across warm invocations."""
+    cached = _secret_cache.get(secret_name)
+    if cached and cached[1] > time.monotonic():
+        return cached[0]
+
     try:
-        response = secretsmanager.get_secret_value(SecretId=secret_name)
-        return response['SecretString']
+        response = get_secretsmanager_client().get_secret_value(SecretId=secret_name)
+        secret = response['SecretString']
+        _secret_cache[secret_name] = (secret, time.monotonic() + SECRET_CACHE_TTL)
+        return secret
     except Exception as e:
         logger.error(f"Error retrieving secret {secret_name}: {str(e)}")
         raise
 
 
+def prefetch_secrets(secret_names: List[Optional[str]]) -> None:
+    """
+    Warm the secret cache with one BatchGetSecretValue call.
+    Only uncached names are requested; any the batch does not return, or
+    all of them if the call fails, are left to get_secret.
+    """
+    now = time.monotonic()
+    stale = [
+        name for name in secret_names
+        if name and not (name in _secret_cache and _secret_cache[name][1] > now)
+    ]
+    if len(stale) < 2:
+        return
+
+    try:
+        response = get_secretsmanager_client().batch_get_secret_value(SecretIdList=stale)
+    except Exception as e:
+        logger.debug(f"Batch secret retrieval failed, fetching secrets individually: {e}")
+        return
+
+    expiry = time.monotonic() + SECRET_CACHE_TTL
+    for value in response.get('SecretValues', []):
+        if 'SecretString' not in value:
+            continue
+        for secret_id in (value.get('Name'), value.get('ARN')):
+            if secret_id in stale:
+                _secret_cache[secret_id] = (value['SecretString'], expiry)
+
+
 def lambda_handler(event: Dict, context) -> Dict:
     """
     Upload provider from S3 to HCP Terraform.
@@ -72,7 +264,7 @@ def lambda_handler(event: Dict, context) -> Dict:
     Expected event structure:
     {
         "s3Bucket": "...",
-        "manifestKey": "tmp/aws/6.26.0/manifest.json",
+        "manifestKey": "tmp/hashicorp/aws/6.26.0/manifest.json",
         ...
     }
 
@@ -85,18 +277,24 @@ def lambda_handler(event: Dict, context) -> Dict:
     }
     """
     try:
-        # Get configuration from environment
-        secret_name = os.environ.get('TFC_TOKEN_SECRET_NAME')
-        organization = os.environ.get('TFC_ORGANIZATION')
-        tfc_address = os.environ.get('TFC_ADDRESS', 'https://app.terraform.io')
-
-        if not secret_name or not organization:
+        if not TFC_TOKEN_SECRET_NAME or not TFC_ORGANIZATION:
             raise ValueError(
                 "Missing required environment variables: TFC_TOKEN_SECRET_NAME, TFC_ORGANIZATION")
 
-        # Retrieve token from Secrets Manager
-        logger.debug(f"Retrieving TFC token from Secrets Manager: {secret_name}")
-        token = get_secret(secret_name)
+        # Retrieve token (and CA bundle, unless the file on disk is still
+        # fresh) from Secrets Manager in one call
+        logger.debug(f"Retrieving TFC token from Secrets Manager: {TFC_TOKEN_SECRET_NAME}")
+        secret_names = [TFC_TOKEN_SECRET_NAME]
+        if not ca_bundle_is_fresh():
+            secret_names.append(CA_BUNDLE_SECRET_NAME)
+        prefetch_secrets(secret_names)
+        token = get_secret(TFC_TOKEN_SECRET_NAME)
+
+        # TLS verification is configured once per invocation;
+        # authorization stays per request
+        ca_bundle = get_ca_bundle_path()
+        _session.verify = ca_bundle or True
+        configure_upload_pool(ca_bundle)
 
         bucket = event['s3Bucket']
         manifest_key = event['manifestKey']
@@ -104,22 +302,19 @@ def lambda_handler(event: Dict, context) -> Dict:
         # Download and parse manifest
         logger.info(f"Reading manifest from s3://{bucket}/{manifest_key}")
         manifest_obj = s3_client.get_object(Bucket=bucket, Key=manifest_key)
-        manifest = json.loads(manifest_obj['Body'].read().decode('utf-8'))
+        manifest = _json_loads(manifest_obj['Body'].read())
 
         provider = manifest['provider']
         version = manifest['version']
         gpg_key_id = manifest['gpg_key_id']
 
-        logger.info(f"Uploading {provider} v{version} to {organization} at {tfc_address}")
+        logger.info(f"Uploading {provider} v{version} to {TFC_ORGANIZATION} at {TFC_ADDRESS}")
 
         # Upload to HCP Terraform
-        with tempfile.TemporaryDirectory() as temp_dir:
-            temp_path = Path(temp_dir)
-
-            upload_result = upload_to_hcp(
-                organization, provider, version, gpg_key_id,
-                manifest, bucket, token, tfc_address, temp_path
-            )
+        upload_result = upload_to_hcp(
+            TFC_ORGANIZATION, provider, version, gpg_key_id,
+            manifest, bucket, token, TFC_ADDRESS
+        )
 
         logger.info(f"Successfully uploaded {upload_result['platforms_count']} platforms")
 
@@ -131,8 +326,8 @@ def lambda_handler(event: Dict, context) -> Dict:
             'version': version,
             'platformsUploaded': upload_result['platforms_count'],
             'registryUrl': (
-                f"{tfc_address}/app/{organization}/registry/private/providers/"
-                f"{organization}/{provider}/{version}"
+                f"{TFC_ADDRESS}/app/{TFC_ORGANIZATION}/registry/private/providers/"
+                f"{TFC_ORGANIZATION}/{provider}/{version}"
             )
         }
 
@@ -149,8 +344,7 @@ def upload_to_hcp(
         manifest: Dict,
         bucket: str,
         token: str,
-        tfc_address: str,
-        temp_path: Path
+        tfc_address: str
 ) -> Dict:
     """Upload provider to HCP Terraform from S3."""
     headers = {
@@ -158,53 +352,139 @@ def upload_to_hcp(
         "Content-Type": "application/vnd.api+json"
     }
 
-    # Check if provider exists
-    provider_exists = check_provider_exists(
-        organization, provider, headers, tfc_address)
-
-    # Create provider if needed
-    if not provider_exists:
-        create_provider(organization, provider, headers, tfc_address)
-
-    # Create version
-    version_data = create_version(
-        organization, provider, version, gpg_key_id,
-        headers, tfc_address
+    # Every provider, version and platform endpoint shares this prefix
+    provider_base_url = (
+        f"{tfc_address}/api/v2/organizations/{organization}/"
+        f"registry-providers/private/{organization}/{provider}"
     )
 
-    # Download and upload SHA256SUMS and signature from S3
-    shasums_upload_url = version_data['data']['links']['shasums-upload']
-    shasums_sig_upload_url = version_data['data']['links']['shasums-sig-upload']
-
-    shasums_path = temp_path / "SHA256SUMS"
-    sig_path = temp_path / "SHA256SUMS.sig"
-
-    s3_client.download_file(bucket, manifest['shasums_key'], str(shasums_path))
-    s3_client.download_file(bucket, manifest['signature_key'], str(sig_path))
-
-    upload_file_to_url(shasums_path, shasums_upload_url)
-    upload_file_to_url(sig_path, shasums_sig_upload_url)
-
-    # Upload binaries
-    platforms_uploaded = 0
-    for binary_info in manifest['binaries']:
-        # Download binary from S3 to temp
-        binary_path = temp_path / binary_info['filename']
-        s3_client.download_file(bucket, binary_info['s3_key'], str(binary_path))
+    binaries = manifest['binaries']
 
-        shasum = calculate_shasum(binary_path)
-
-        # Create platform
-        platform_data = create_platform(
-            organization, provider, version,
-            binary_info['os'], binary_info['arch'],
-            binary_info['filename'], shasum, headers, tfc_address
-        )
-
-        # Upload binary
-        binary_upload_url = platform_data['data']['links']['provider-binary-upload']
-        upload_file_to_url(binary_path, binary_upload_url)
-        platforms_uploaded += 1
+    def binary_shasum(binary_info: Dict) -> Optional[str]:
+        recorded = binary_info.get('shasum')
+        expected = expected_shasums.get(binary_info['filename'])
+        if recorded and expected and recorded != expected:
+            raise ValueError(
+                f"SHA256 mismatch for {binary_info['filename']}: "
+                f"downloaded {recorded}, SHA256SUMS lists {expected}")
+        return recorded or expected
+
+    def prefetch_binary(binary_info: Dict) -> Tuple[BinaryIO, str]:
+        return spool_s3_object(bucket, binary_info['s3_key'])
+
+    def open_binary(binary_info: Dict, shasum: str) -> Tuple[BinaryIO, str]:
+        return S3ObjectReader(bucket, binary_info['s3_key']), shasum
+
+    def close_prefetched(prefetch: Future) -> None:
+        # Release the binary body once it is available, even if the upload
+        # that would have consumed it failed first
+        def close(done: Future) -> None:
+            if not done.cancelled() and done.exception() is None:
+                done.result()[0].close()
+        prefetch.add_done_callback(close)
+
+    # S3 reads run in the background while the provider, version and
+    # SHA256SUMS requests below are in flight. Binaries with a known digest
+    # are later streamed from S3 straight to HCP; any others are fetched
+    # into a spooled buffer and hashed here.
+    prefetch_pool = ThreadPoolExecutor(
+        max_workers=min(MAX_PLATFORM_WORKERS, len(binaries)) + 1)
+    prefetched = []
+    try:
+        sig_download = prefetch_pool.submit(read_s3_object, bucket, manifest['signature_key'])
+
+        # SHA256SUMS lists the registry's digest for every binary, so it is
+        # read first and binaries without a digest in the manifest need no
+        # hashing
+        shasums_content = read_s3_object(bucket, manifest['shasums_key'])
+        expected_shasums = parse_shasums(shasums_content)
+
+        shasums = [binary_shasum(b) for b in binaries]
+        prefetched = [
+            None if shasum else prefetch_pool.submit(prefetch_binary, b)
+            for b, shasum in zip(binaries, shasums)
+        ]
+
+        # Check if provider exists
+        provider_exists = check_provider_exists(provider_base_url, headers)
+
+        # Create provider if needed
+        if not provider_exists:
+            create_provider(organization, provider, headers, tfc_address)
+            _known_providers.add(provider_base_url)
+
+        # Create version, unless an earlier attempt at this upload already
+        # did; a provider created just now cannot have any versions yet
+        version_url = f"{provider_base_url}/versions/{version}"
+        version_data = get_version(version_url, headers) if provider_exists else None
+        if version_data is None:
+            version_data = create_version(
+                provider_base_url, version, gpg_key_id, headers
+            )
+        links = version_data['data'].get('links', {})
+        attributes = version_data['data'].get('attributes', {})
+        upload_shasums = not attributes.get('shasums-uploaded')
+        upload_shasums_sig = not attributes.get('shasums-sig-uploaded')
+
+        def upload_binary(
+                binary_info: Dict,
+                shasum: Optional[str],
+                prefetch: Optional[Future]) -> None:
+            if prefetch is None:
+                # Open the S3 stream while the platform is created, so the
+                # GET's first-byte latency overlaps the HCP request
+                prefetch = prefetch_pool.submit(open_binary, binary_info, shasum)
+            else:
+                shasum = prefetch.result()[1]
+
+            try:
+                # Create platform
+                platform_data = create_platform(
+                    provider_base_url, version,
+                    binary_info['os'], binary_info['arch'],
+                    binary_info['filename'], shasum, headers
+                )
+
+                # Upload binary
+                binary_upload_url = platform_data['data']['links']['provider-binary-upload']
+                upload_to_url(prefetch.result()[0], binary_upload_url)
+            finally:
+                close_prefetched(prefetch)
+
+        # Upload binaries; platforms are independent, so they are created and
+        # uploaded concurrently and the first failure is raised
+        platforms_uploaded = 0
+        max_workers = max(1, min(MAX_PLATFORM_WORKERS, len(binaries)))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(upload_binary, binary_info, shasum, prefetch): binary_info
+                for binary_info, shasum, prefetch in zip(binaries, shasums, prefetched)
+            }
+            try:
+                # SHA256SUMS and its signature only need the version to exist,
+                # so they go up while the platforms are being created
+                if upload_shasums:
+                    upload_to_url(shasums_content, links['shasums-upload'])
+                if upload_shasums_sig:
+                    upload_to_url(sig_download.result(), links['shasums-sig-upload'])
+
+                for future in as_completed(futures):
+                    future.result()
+                    binary_info = futures[future]
+                    logger.info(f"Uploaded {binary_info['os']}/{binary_info['arch']}")
+                    platforms_uploaded += 1
+            except Exception:
+                # Platforms not yet started are not worth uploading
+                for pending in futures:
+                    pending.cancel()
+                raise
+    finally:
+        # On failure, skip prefetches that have not started yet and release
+        # the spooled buffers of those that did
+        prefetch_pool.shutdown(wait=True, cancel_futures=True)
+        for prefetch in prefetched:
+            if prefetch is not None:
+                close_prefetched(prefetch)
 
     return {
         'platforms_count': platforms_uploaded
@@ -212,17 +492,18 @@ def upload_to_hcp(
 
 
 def check_provider_exists(
-        organization: str,
-        provider: str,
-        headers: Dict,
-        tfc_address: str
+        provider_base_url: str,
+        headers: Dict
 ) -> bool:
-    """Check if provider exists."""
-    url = f"{tfc_address}/api/v2/organizations/{organization}/registry-providers/private/{organization}/{provider}"
-    ca_bundle = get_ca_bundle_path()
-    verify = ca_bundle if ca_bundle else True
-    response = requests.get(url, headers=headers, timeout=10, verify=verify)
-    return response.status_code == 200
+    """Check if provider exists, remembering positive results."""
+    if provider_base_url in _known_providers:
+        return True
+
+    response = _session.get(provider_base_url, headers=headers, timeout=10)
+    if response.status_code == 200:
+        _known_providers.add(provider_base_url)
+        return True
+    return False
 
 
 def create_provider(
@@ -243,25 +524,30 @@ def create_provider(
             }
         }
     }
-    ca_bundle = get_ca_bundle_path()
-    verify = ca_bundle if ca_bundle else True
-    response = requests.post(url, headers=headers, json=data, timeout=10, verify=verify)
+    response = _session.post(url, headers=headers, data=_json_dumps(data), timeout=10)
+    response.raise_for_status()
+
+
+def get_version(
+        version_url: str,
+        headers: Dict
+) -> Optional[Dict]:
+    """Get provider version, or None if it does not exist yet."""
+    response = _session.get(version_url, headers=headers, timeout=10)
+    if response.status_code == 404:
+        return None
     response.raise_for_status()
+    return _json_loads(response.content)
 
 
 def create_version(
-        organization: str,
-        provider: str,
+        provider_base_url: str,
         version: str,
         key_id: str,
-        headers: Dict,
-        tfc_address: str
+        headers: Dict
 ) -> Dict:
     """Create provider version."""
-    url = (
-        f"{tfc_address}/api/v2/organizations/{organization}/"
-        f"registry-providers/private/{organization}/{provider}/versions"
-    )
+    url = f"{provider_base_url}/versions"
     data = {
         "data": {
             "type": "registry-provider-versions",
@@ -272,29 +558,25 @@ def create_version(
             }
         }
     }
-    ca_bundle = get_ca_bundle_path()
-    verify = ca_bundle if ca_bundle else True
-    response = requests.post(url, headers=headers, json=data, timeout=10, verify=verify)
+    response = _session.post(url, headers=headers, data=_json_dumps(data), timeout=10)
+    if response.status_code == 404:
+        # The provider was removed outside this pipeline; check again next time
+        _known_providers.discard(provider_base_url)
     response.raise_for_status()
-    return response.json()
+    return _json_loads(response.content)
 
 
 def create_platform(
-        organization: str,
-        provider: str,
+        provider_base_url: str,
         version: str,
         os_name: str,
         arch: str,
         filename: str,
         shasum: str,
-        headers: Dict,
-        tfc_address: str
+        headers: Dict
 ) -> Dict:
     """Create platform."""
-    url = (
-        f"{tfc_address}/api/v2/organizations/{organization}/"
-        f"registry-providers/private/{organization}/{provider}/versions/{version}/platforms"
-    )
+    url = f"{provider_base_url}/versions/{version}/platforms"
     data = {
         "data": {
             "type": "registry-provider-version-platforms",
@@ -306,29 +588,141 @@ def create_platform(
             }
         }
     }
-    ca_bundle = get_ca_bundle_path()
-    verify = ca_bundle if ca_bundle else True
-    response = requests.post(url, headers=headers, json=data, timeout=10, verify=verify)
+    response = _session.post(url, headers=headers, data=_json_dumps(data), timeout=10)
     response.raise_for_status()
-    return response.json()
+    return _json_loads(response.content)
 
 
-def upload_file_to_url(
-        filepath: Path,
+def configure_upload_pool(ca_bundle: Optional[str]) -> None:
+    """Build the upload connection pool, rebuilding it only if the CA bundle changed."""
+    global _upload_http, _upload_http_ca
+
+    if _upload_http is not None and ca_bundle == _upload_http_ca:
+        return
+
+    _upload_http = urllib3.PoolManager(
+        num_pools=16,
+        maxsize=32,
+        cert_reqs='CERT_REQUIRED',
+        ca_certs=ca_bundle or certifi.where(),
+        blocksize=UPLOAD_BLOCK_SIZE,
+        retries=Retry(
+            total=3,
+            backoff_factor=0.3,
+            status_forcelist=[429, 500, 502, 503, 504],
+            raise_on_status=False))
+    _upload_http_ca = ca_bundle
+
+
+def upload_to_url(
+        body: Union[bytes, BinaryIO],
         url: str
 ) -> None:
-    """Upload file to presigned URL."""
-    ca_bundle = get_ca_bundle_path()
-    verify = ca_bundle if ca_bundle else True
-    with open(filepath, 'rb') as f:
-        response = requests.put(url, data=f, timeout=300, verify=verify)
-        response.raise_for_status()
-
-
-def calculate_shasum(filepath: Path) -> str:
-    """Calculate SHA256 hash of file."""
-    sha256_hash = hashlib.sha256()
-    with open(filepath, "rb") as f:
-        for byte_block in iter(lambda: f.read(4096), b""):
-            sha256_hash.update(byte_block)
-    return sha256_hash.hexdigest()
+    """
+    Upload bytes or a file object with a known length to presigned URL.
+    File bodies are rewound by urllib3 when a retry resends them.
+    """
+    if hasattr(body, '__len__'):
+        length = len(body)
+    else:
+        position = body.tell()
+        length = body.seek(0, os.SEEK_END) - position
+        body.seek(position)
+
+    response = _upload_http.request(
+        'PUT', url, body=body, headers={'Content-Length': str(length)}, timeout=300)
+    if response.status >= 400:
+        # The presigned URL carries credentials, so it is not logged
+        raise RuntimeError(f"Upload to presigned URL failed with HTTP {response.status}")
+
+
+def read_s3_object(bucket: str, s3_key: str) -> bytes:
+    """Read a small S3 object, such as SHA256SUMS or its signature, into memory."""
+    return s3_client.get_object(Bucket=bucket, Key=s3_key)['Body'].read()
+
+
+def spool_s3_object(
+        bucket: str,
+        s3_key: str
+) -> Tuple[BinaryIO, str]:
+    """
+    Fetch an S3 object with ranged GETs and hash it in a single call.
+    Objects up to SPOOL_MAX_SIZE are held in memory; larger ones go to a
+    anonymous temporary file, which is hashed through mmap and removed when
+    closed.
+    """
+    size = s3_client.head_object(Bucket=bucket, Key=s3_key)['ContentLength']
+    if size <= SPOOL_MAX_SIZE:
+        spooled = io.BytesIO()
+    else:
+        spooled = tempfile.TemporaryFile()
+    try:
+        s3_client.download_fileobj(bucket, s3_key, spooled, Config=TRANSFER_CONFIG)
+        if isinstance(spooled, io.BytesIO):
+            with spooled.getbuffer() as view:
+                shasum = hashlib.sha256(view).hexdigest()
+        else:
+            spooled.flush()
+            with mmap.mmap(spooled.fileno(), 0, access=mmap.ACCESS_READ) as view:
+                shasum = hashlib.sha256(view).hexdigest()
+        spooled.seek(0)
+    except Exception:
+        spooled.close()
+        raise
+    return spooled, shasum
+
+
+class S3ObjectReader:
+    """
+    Seekable, sized file-like view of an S3 object.
+    The length gives upload_to_url an explicit Content-Length for the
+    upload pool; seeking re-opens the object at that offset so urllib3 can
+    rewind the body when it retries a PUT.
+    """
+
+    def __init__(self, bucket: str, s3_key: str):
+        self._bucket = bucket
+        self._s3_key = s3_key
+        response = s3_client.get_object(Bucket=bucket, Key=s3_key)
+        self._body = response['Body']
+        self._length = response['ContentLength']
+        self._position = 0
+
+    def __len__(self) -> int:
+        return self._length
+
+    def read(self, size: int = -1) -> bytes:
+        data = self._body.read(size if size >= 0 else None)
+        self._position += len(data)
+        return data
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        if whence != os.SEEK_SET:
+            raise OSError("S3ObjectReader only supports absolute seeks")
+        if offset != self._position:
+            self._body.close()
+            response = s3_client.get_object(
+                Bucket=self._bucket, Key=self._s3_key, Range=f"bytes={offset}-")
+            self._body = response['Body']
+            self._position = offset
+        return self._position
+
+    def close(self) -> None:
+        self._body.close()
+
+
+def parse_shasums(content: bytes) -> Dict[str, str]:
+    """
+    Parse SHA256SUMS content into {filename: sha256}.
+    A leading '*' on the filename marks binary mode in sha256sum output and
+    is not part of the name.
+    """
+    shasums = {}
+    for line in content.decode('utf-8').splitlines():
+        parts = line.split()
+        if len(parts) == 2:
+            shasums[parts[1].lstrip('*')] = parts[0]
+    return shasums
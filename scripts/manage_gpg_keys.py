@@ -7,9 +7,12 @@ import argparse
 import os
 import sys
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Tuple
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 
 class GPGKeyManager:
@@ -34,6 +37,21 @@ class GPGKeyManager:
             "Content-Type": "application/vnd.api+json"
         }
 
+        # One session for every call, so the registry and HCP connections are
+        # kept alive between requests. Headers stay per request so the token
+        # is only sent to HCP Terraform, not the public registry.
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=8,
+            pool_maxsize=32,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.2,
+                status_forcelist=[429, 500, 502, 503, 504],
+                raise_on_status=False))
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
     def fetch_provider_signing_keys(self, namespace: str, provider: str, version: str = None) -> List[Dict]:
         """
         Fetch signing keys from Terraform public registry.
@@ -49,19 +67,40 @@ class GPGKeyManager:
         # If no version specified, get the latest
         if not version:
             url = f"{self.REGISTRY_API_BASE}/{namespace}/{provider}"
-            response = requests.get(url)
+            response = self.session.get(url)
             response.raise_for_status()
             version = response.json().get("version")
 
         # Get download info which includes signing keys
         # We need to query with a platform, but signing keys are the same for all platforms
         url = f"{self.REGISTRY_API_BASE}/{namespace}/{provider}/{version}/download/linux/amd64"
-        response = requests.get(url)
+        response = self.session.get(url)
         response.raise_for_status()
 
         data = response.json()
         return data.get("signing_keys", {}).get("gpg_public_keys", [])
 
+    def fetch_provider_signing_keys_many(
+            self,
+            providers: List[Tuple[str, str, Optional[str]]],
+            max_workers: int = 8) -> List[List[Dict]]:
+        """
+        Fetch signing keys for several providers concurrently.
+
+        Args:
+            providers: (namespace, provider, version) tuples; version may be None for latest
+            max_workers: Maximum number of providers fetched at once
+
+        Returns:
+            List of signing key lists, in the same order as providers
+        """
+        if not providers:
+            return []
+
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(providers))) as executor:
+            return list(executor.map(
+                lambda p: self.fetch_provider_signing_keys(*p), providers))
+
     def list_keys(self) -> List[Dict]:
         """
         List all GPG keys for the organization.
@@ -71,7 +110,7 @@ class GPGKeyManager:
         """
         url = f"{self.API_BASE}/registry/private/v2/gpg-keys"
         params = {"filter[namespace]": self.organization}
-        response = requests.get(url, params=params, headers=self.headers)
+        response = self.session.get(url, params=params, headers=self.headers)
         response.raise_for_status()
 
         data = response.json()
@@ -89,7 +128,7 @@ class GPGKeyManager:
         """
         url = f"{self.API_BASE}/registry/private/v2/gpg-keys/{self.organization}/{key_id}"
 
-        response = requests.get(url, headers=self.headers)
+        response = self.session.get(url, headers=self.headers)
 
         if response.status_code == 404:
             return None
@@ -119,7 +158,7 @@ class GPGKeyManager:
             }
         }
 
-        response = requests.post(url, headers=self.headers, json=data)
+        response = self.session.post(url, headers=self.headers, json=data)
         response.raise_for_status()
 
         return response.json().get("data")
@@ -147,7 +186,7 @@ class GPGKeyManager:
             }
         }
 
-        response = requests.patch(url, headers=self.headers, json=data)
+        response = self.session.patch(url, headers=self.headers, json=data)
         response.raise_for_status()
 
         return response.json().get("data")
@@ -164,7 +203,7 @@ class GPGKeyManager:
         """
         url = f"{self.API_BASE}/registry/private/v2/gpg-keys/{self.organization}/{key_id}"
 
-        response = requests.delete(url, headers=self.headers)
+        response = self.session.delete(url, headers=self.headers)
 
         if response.status_code == 404:
             return False
@@ -406,11 +445,27 @@ def cmd_fetch(args, manager: GPGKeyManager):
         else:
             print(f"Version: latest")
 
-        keys = manager.fetch_provider_signing_keys(args.namespace, args.provider, args.version)
-
-        if not keys:
-            print(f"No signing keys found for {args.namespace}/{args.provider}", file=sys.stderr)
-            return 1
+        providers = [(args.namespace, args.provider, args.version)]
+        for extra in args.also or []:
+            namespace, _, provider = extra.partition('/')
+            if not namespace or not provider:
+                print(f"Invalid --also value '{extra}', expected NAMESPACE/PROVIDER", file=sys.stderr)
+                return 1
+            print(f"Also fetching signing keys for {namespace}/{provider} (latest)")
+            providers.append((namespace, provider, None))
+
+        # Providers from the same publisher share signing keys; list each once
+        keys = []
+        seen_key_ids = set()
+        for (namespace, provider, _), provider_keys in zip(
+                providers, manager.fetch_provider_signing_keys_many(providers)):
+            if not provider_keys:
+                print(f"No signing keys found for {namespace}/{provider}", file=sys.stderr)
+                return 1
+            for key in provider_keys:
+                if key.get("key_id") not in seen_key_ids:
+                    seen_key_ids.add(key.get("key_id"))
+                    keys.append(key)
 
         print(f"\nFound {len(keys)} signing key(s):\n")
 
@@ -513,6 +568,7 @@ Examples:
   %(prog)s fetch integrations github --version 6.9.0
   %(prog)s fetch integrations github --show-key
   %(prog)s fetch integrations github --output github-key.asc
+  %(prog)s fetch hashicorp aws --also hashicorp/google
 
   # Extract key ID from ASCII armored key file
   %(prog)s extract --file my-key.asc
@@ -551,6 +607,8 @@ Examples:
     fetch_parser.add_argument('--version', help='Provider version (defaults to latest)')
     fetch_parser.add_argument('--show-key', action='store_true', help='Display the public key')
     fetch_parser.add_argument('--output', help='Save key to file')
+    fetch_parser.add_argument('--also', action='append', metavar='NAMESPACE/PROVIDER',
+                              help='Also fetch keys for another provider (latest version); may be repeated')
     fetch_parser.set_defaults(func=cmd_fetch)
 
     # Extract command
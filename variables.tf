@@ -79,6 +79,17 @@ variable "lambda_runtime" {
   default     = "python3.12"
 }
 
+variable "lambda_architecture" {
+  description = "Instruction set architecture of the Lambda functions and layer (arm64 or x86_64); a layer passed in lambda_layer_arn must be built for it"
+  type        = string
+  default     = "arm64"
+
+  validation {
+    condition     = contains(["arm64", "x86_64"], var.lambda_architecture)
+    error_message = "lambda_architecture must be either 'arm64' or 'x86_64'."
+  }
+}
+
 variable "lambda_layer_arn" {
   description = "ARN of the Lambda layer to use"
   type        = string
@@ -138,3 +149,14 @@ variable "ca_bundle_secret_name" {
   type        = string
   default     = ""
 }
+
+variable "secret_cache_ttl" {
+  description = "Seconds a warm Lambda container reuses secrets fetched from Secrets Manager before fetching them again"
+  type        = number
+  default     = 600
+
+  validation {
+    condition     = var.secret_cache_ttl >= 0
+    error_message = "secret_cache_ttl must be zero or greater."
+  }
+}